@@ -1,9 +1,14 @@
+import gc
 import json
 import os.path
+from contextlib import contextmanager
 from enum import Enum
 from os import PathLike
-from typing import Dict, Union, List, Tuple
+from typing import Any, Dict, Union, List, Set, Tuple
 from uuid import UUID
+
+from database.expressions import And, Apply, Compare, Expression, In, np
+from database.views import View
 from tables import TableRow, tables
 
 
@@ -23,10 +28,28 @@ def default_serializer(o):
         return o  # Вернуть объект без изменений
 
 
+@contextmanager
+def _gc_paused():
+    """
+    Приостанавливает циклический сборщик мусора на время массового создания объектов.
+    Иначе при загрузке и сохранении больших таблиц сборщик многократно обходит все новые записи.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+# Общий экземпляр энкодера: json.dumps с параметром default создает новый энкодер при каждом вызове
+_encoder = json.JSONEncoder(default=default_serializer)
+
 
 class DataBase:
     """
-    Простая ORM с функционалом для управления базой данных, представленной в виде JSON-файла.
+    Простая ORM с функционалом для управления базой данных, представленной в виде JSON-файлов.
     Использует шаблон Singleton для обеспечения единственного экземпляра базы данных.
     """
     _instance = None
@@ -43,12 +66,12 @@ class DataBase:
         :param class_table: Класс, представляющий таблицу.
         :raises Exception: Если таблица не указана.
         """
-        if not self._db:
-            self._db = {}
+        if self._db is None:
+            DataBase._db = {}
         if not class_table:
             raise Exception('Передайте таблицу для работы')
         self._current_table_name = str(class_table.__name__.lower())
-        self._current_table = self._db.get(self._current_table_name)
+        self._current_table = self._load_table(self._current_table_name)
 
     # Статические переменные базы данных
     _db: Dict[str, List[TableRow]] | None = None  # Словарь для хранения данных таблиц
@@ -56,81 +79,317 @@ class DataBase:
     _current_table: List[TableRow] | None = None  # Текущая таблица
     _current_table_name: str | None = None  # Имя текущей таблицы
     _results: List[TableRow] | None = None  # Результаты фильтрации данных
+    _columns: Dict[str, Dict[str, Any]] = {}  # Кэш столбцов таблиц в виде массивов NumPy
+    _vectorize_threshold: int = 10000  # Минимальный размер таблицы для фильтрации через NumPy
+    _views: Dict[str, View] = {}  # Зарегистрированные материализованные представления
+    _manifest: Dict[str, str] = {}  # Имена файлов таблиц
+    _dirty: Set[str] = set()  # Измененные таблицы, которые нужно сохранить
+    _stale_views: Set[str] = set()  # Представления, которые будут пересчитаны при первом обращении
 
     @classmethod
     def init_db(cls, db_name: Union[str, PathLike]) -> None:
         """
         Инициализирует базу данных.
+        Каждая таблица хранится в отдельном файле, список файлов таблиц хранится в манифесте.
+        Таблицы загружаются при первом обращении к ним.
 
-        :param db_name: Имя файла JSON для хранения данных.
+        :param db_name: Имя файла манифеста базы данных.
         """
         cls._db = {}
+        cls._columns = {}
+        cls._dirty = set()
         cls._db_name = db_name
+        cls._manifest = {}
+        for table in tables:
+            table.clear_codec_caches()
         if not os.path.exists(cls._db_name):
             for table in tables:
                 table_name = str(table.__name__.lower())
                 cls._db[table_name] = []
+                cls._dirty.add(table_name)
             cls.save_db()
         else:
-            with open(db_name, 'r') as file:
+            with open(db_name, 'r') as file, _gc_paused():
                 data = json.loads(file.read())
-                for table in tables:
-                    table_name = str(table.__name__.lower())
-                    table_data = data.get(table_name)
-                    fields = table_data.pop(0)
-                    cls._db[table_name] = []
-                    for row in table_data:
-                        kwargs = {}
-                        col = 0
-                        for field in fields:
-                            kwargs[field] = row[col]
-                            col += 1
-                        row_object = table(**kwargs)
-                        cls._db[table_name].append(row_object)
+            if 'tables' in data:
+                cls._manifest = data['tables']
+            else:
+                # Файл в старом формате: все таблицы в одном файле, переносим их в отдельные файлы
+                with _gc_paused():
+                    for table in tables:
+                        table_name = str(table.__name__.lower())
+                        cls._db[table_name] = cls._read_table(table, data.get(table_name))
+                        cls._dirty.add(table_name)
+                cls.save_db()
+        # Представления пересчитываются при первом обращении, чтобы не загружать их таблицы при запуске
+        cls._stale_views = set(cls._views)
 
+    @classmethod
+    def _table_path(cls, table_name: str) -> str:
+        """
+        Возвращает путь к файлу таблицы.
+
+        :param table_name: Имя таблицы.
+        :return: Путь к файлу таблицы рядом с манифестом.
+        """
+        file_name = cls._manifest.get(table_name)
+        if not file_name:
+            base_name = os.path.splitext(os.path.basename(cls._db_name))[0]
+            file_name = f'{base_name}.{table_name}.json'
+        return os.path.join(os.path.dirname(cls._db_name), file_name)
+
+    @staticmethod
+    def _read_table(table: type[TableRow], table_data: List[List] | None) -> List[TableRow]:
+        """
+        Преобразует сохраненные данные таблицы в записи.
+        Если порядок полей в файле совпадает с текущим описанием таблицы, используется
+        сгенерированный декодер `from_values`, иначе записи создаются через конструктор.
 
+        :param table: Класс таблицы.
+        :param table_data: Список, первый элемент которого содержит имена полей, остальные — значения записей.
+        :return: Список записей.
+        """
+        if not table_data:
+            return []
+        fields = table_data.pop(0)
+        if tuple(fields) == table.field_names:
+            rows = list(map(table.from_values, table_data))
+            table.clear_codec_caches()
+            return rows
+        rows = []
+        for row in table_data:
+            kwargs = {}
+            col = 0
+            for field in fields:
+                kwargs[field] = row[col]
+                col += 1
+            row_object = table(**kwargs)
+            rows.append(row_object)
+        return rows
+
+    @classmethod
+    def _load_table(cls, table_name: str) -> List[TableRow] | None:
+        """
+        Возвращает таблицу, при первом обращении загружая ее из файла.
+
+        :param table_name: Имя таблицы.
+        :return: Список записей или None, если такой таблицы нет.
+        :raises Exception: Если таблица указана в манифесте, но ее файл отсутствует.
+        """
+        if table_name in cls._db:
+            return cls._db[table_name]
+        table = next((t for t in tables if t.__name__.lower() == table_name), None)
+        if table is None:
+            return None
+        table_data = None
+        if cls._db_name and table_name in cls._manifest:
+            path = cls._table_path(table_name)
+            if not os.path.exists(path):
+                # Пустая таблица вместо отсутствующего файла перезаписала бы данные при следующем сохранении
+                raise Exception(f'Файл таблицы {table_name} не найден: {path}')
+            with open(path, 'r') as file, _gc_paused():
+                table_data = json.loads(file.read())
+        with _gc_paused():
+            cls._db[table_name] = cls._read_table(table, table_data)
+        return cls._db[table_name]
+
+    @classmethod
+    def _rebuild_view(cls, view: View) -> None:
+        """
+        Загружает таблицы представления и пересчитывает его.
+
+        :param view: Представление.
+        """
+        cls._load_table(view.table_name)
+        if view.join_table_name:
+            cls._load_table(view.join_table_name)
+        view.rebuild(cls._db)
+        cls._stale_views.discard(view.name)
+        # Представление перезаписывает присоединенные поля записей основной таблицы
+        columns = cls._columns.get(view.table_name)
+        if columns:
+            for field in view.joined_fields():
+                columns.pop(field, None)
+
+    @classmethod
+    def register_view(cls, view: View) -> None:
+        """
+        Регистрирует материализованное представление.
+        Представление заполняется при первом обращении к нему.
+
+        :param view: Описание представления.
+        """
+        cls._views[view.name] = view
+        cls._stale_views.add(view.name)
+
+    @classmethod
+    def view(cls, name: str, group=None) -> List[TableRow]:
+        """
+        Возвращает записи материализованного представления.
+        При первом обращении после загрузки базы представление пересчитывается целиком.
+
+        :param name: Имя представления.
+        :param group: Значение поля группировки (для представлений с `group_by`).
+        :return: Список записей.
+        :raises Exception: Если представление не зарегистрировано.
+        """
+        if name not in cls._views:
+            raise Exception(f'Представление {name} не найдено.')
+        if name in cls._stale_views:
+            cls._rebuild_view(cls._views[name])
+        return cls._views[name].rows(group)
+
+    def _notify(self, action: str, rows: List[TableRow]):
+        """
+        Передает изменения текущей таблицы в материализованные представления.
+        Еще не заполненные представления пропускаются: они будут пересчитаны при первом обращении.
+
+        :param action: Тип изменения: 'add', 'update' или 'delete'.
+        :param rows: Измененные записи.
+        """
+        for view in self._views.values():
+            if view.name in self._stale_views:
+                continue
+            view.apply(self._current_table_name, action, rows)
+            # Представление перезаписывает присоединенные поля записей основной таблицы
+            columns = self._columns.get(view.table_name)
+            if columns:
+                for field in view.joined_fields():
+                    columns.pop(field, None)
+
+    @staticmethod
+    def _write_file(path: str, text: str) -> None:
+        """
+        Атомарно заменяет содержимое файла: данные пишутся во временный файл, который затем
+        переименовывается поверх старого. При сбое старый файл остается целым.
+
+        :param path: Путь к файлу.
+        :param text: Новое содержимое файла.
+        """
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as file:
+            file.write(text)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
 
     @classmethod
     def save_db(cls):
         """
-        Сохраняет данные базы данных в файл JSON.
+        Сохраняет измененные таблицы, каждую в свой файл, и манифест базы данных.
+        Неизмененные таблицы не перезаписываются.
         """
-        result = {}
+        manifest = dict(cls._manifest)
         for table in tables:
             table_name = str(table.__name__.lower())
-            result[table_name] = []
-            fields = ['id'] + list(table.__annotations__.keys())
-            result[table_name].append(fields)
-            for row in cls._db[table_name]:
-                row_values = []
-                for field in fields:
-                    row_values.append(getattr(row, field, None))
-                result[table_name].append(row_values)
-        with open(cls._db_name, 'w') as file:
-            file.write(json.dumps(result, default=default_serializer))
-
-    def _save_table(self):
+            if table_name not in cls._dirty:
+                continue
+            # Вся таблица сериализуется одним вызовом энкодера
+            with _gc_paused():
+                text = _encoder.encode([table.field_names, *map(table.to_values, cls._db[table_name])])
+            table.clear_codec_caches()
+            cls._write_file(cls._table_path(table_name), text)
+            cls._manifest[table_name] = os.path.basename(cls._table_path(table_name))
+        if manifest != cls._manifest or not os.path.exists(cls._db_name):
+            cls._write_file(cls._db_name, json.dumps({'tables': cls._manifest}, indent=4))
+        cls._dirty = set()
+
+    def _mark_dirty(self):
+        """
+        Отмечает текущую таблицу как измененную, чтобы она была перезаписана при сохранении.
+        """
+        self._dirty.add(self._current_table_name)
+
+    def _save_table(self, fields: List[str] | None = None):
         """
         Сохраняет изменения в текущей таблице.
+
+        :param fields: Измененные поля. Если не указаны, сбрасывается кэш всех столбцов таблицы.
         """
         self._db[self._current_table_name] = self._current_table
+        self._invalidate_columns(fields)
+
+    def _invalidate_columns(self, fields: List[str] | None = None):
+        """
+        Сбрасывает кэш столбцов текущей таблицы.
+
+        :param fields: Поля, столбцы которых устарели. Если не указаны, сбрасываются все столбцы.
+        """
+        if fields is None:
+            self._columns.pop(self._current_table_name, None)
+            return
+        columns = self._columns.get(self._current_table_name)
+        if columns:
+            for field in fields:
+                columns.pop(field, None)
+
+    def _column(self, field: str):
+        """
+        Возвращает столбец текущей таблицы в виде массива NumPy, при необходимости строит его.
+
+        :param field: Имя поля или '' для массива самих записей.
+        :return: Одномерный массив NumPy.
+        """
+        columns = self._columns.setdefault(self._current_table_name, {})
+        column = columns.get(field)
+        if column is None:
+            column = None
+            if field:
+                values = [getattr(row, field, None) for row in self._current_table]
+                # NumPy приводит значения разных типов к общему типу (int и str -> str),
+                # поэтому тип столбца выводится только для значений одного типа
+                if len({type(value) for value in values if value is not None}) == 1:
+                    column = np.array(values)
+            else:
+                values = self._current_table
+            if column is None or column.ndim != 1:
+                # Смешанные значения и значения, которые NumPy пытается развернуть в многомерный массив,
+                # храним как объекты
+                column = np.empty(len(values), dtype=object)
+                column[:] = values
+            columns[field] = column
+        return column
 
-    def filter(self, **kwargs) -> List[TableRow]:
+    @staticmethod
+    def _expression(field_name: str, value) -> Expression:
+        """
+        Преобразует условие фильтрации в формате `поле=значение` в выражение.
+
+        :param field_name: Имя поля.
+        :param value: Значение, список значений или функция от значения поля.
+        :return: Выражение для фильтрации.
+        """
+        if callable(value):
+            return Apply(field_name, value)
+        if isinstance(value, (List, Tuple)):
+            return In(field_name, value)
+        return Compare(field_name, '==', value)
+
+    def filter(self, *expressions: Expression, **kwargs) -> List[TableRow]:
         """
         Фильтрует записи текущей таблицы по указанным условиям.
+        Все условия объединяются в один предикат. Для больших таблиц при наличии NumPy
+        условия вычисляются над столбцами таблицы как булевы маски.
 
+        :param expressions: Условия, построенные через `F` (например, `F('year') > 1950`).
         :param kwargs: Поля и их значения для фильтрации.
         :return: Список записей, соответствующих условиям.
         """
-        self._results = self._current_table
+        conditions = list(expressions)
         for field_name, value in kwargs.items():
-            if callable(value):
-                filter_func = lambda item: item is not None and value(getattr(item, field_name, None))
-            else:
-                if not isinstance(value, (List, Tuple)):
-                    value = [value]
-                filter_func = lambda item: getattr(item, field_name, None) in value
-            self._results = list(filter(filter_func, self._results))
+            conditions.append(self._expression(field_name, value))
+        if not conditions:
+            self._results = self._current_table
+            return self._results
+
+        expression = And(*conditions)
+        size = len(self._current_table)
+        if np is not None and size >= self._vectorize_threshold:
+            columns = {field: self._column(field) for field in expression.fields()}
+            mask = expression.mask(columns, size)
+            self._results = self._column('')[mask].tolist()
+        else:
+            self._results = list(filter(expression.compile(), self._current_table))
         return self._results
 
     def add(self, record: Union[List[TableRow], TableRow]):
@@ -143,6 +402,8 @@ class DataBase:
             record = [record]
         self._current_table.extend(record)
         self._save_table()
+        self._mark_dirty()
+        self._notify('add', record)
 
     # Обновление записи по ID
     def update(self, _id: UUID, **kwargs) -> TableRow:
@@ -164,7 +425,9 @@ class DataBase:
         for row in self._current_table:
             new_table.append(row if row.id != _id else new_row)
         self._current_table = new_table
-        self._save_table()
+        self._save_table(list(kwargs))
+        self._mark_dirty()
+        self._notify('update', [new_row])
         return new_row
 
     def delete(self, _id: UUID):
@@ -175,9 +438,13 @@ class DataBase:
         """
         if not isinstance(_id, List):  # Если удаляется одна запись
             _id = [_id]
+        _id = set(_id)
+        deleted = [item for item in self._current_table if item.id in _id]
         value = lambda item: item.id not in _id  # Условие фильтрации
         self._current_table = list(filter(value, self._current_table))
         self._save_table()
+        self._mark_dirty()
+        self._notify('delete', deleted)
 
     # объединения таблиц
     def join(
@@ -198,7 +465,7 @@ class DataBase:
             raise Exception('Текущая таблица не выбрана.')
 
         other_table_name = other_table_class.__name__.lower()
-        if other_table_name not in self._db:
+        if self._load_table(other_table_name) is None:
             raise Exception(f'Таблица {other_table_name} не найдена.')
 
         if not join_field_self:
@@ -209,7 +476,7 @@ class DataBase:
         # Соединение данных
         other_table = self._db.get(other_table_name)
         other_table_dict = {row.id: row for row in other_table}
-        other_fields = list(other_table[0].__class__.__annotations__.keys())
+        other_fields = list(other_table_class.__annotations__.keys())
         for row in self._current_table:
             other_row = other_table_dict.get(getattr(row, join_field_self))
             for field in other_fields:
@@ -219,3 +486,4 @@ class DataBase:
                     if other_row:
                         other_value = getattr(other_row, field)
                     setattr(row, new_field, other_value)
+        self._invalidate_columns([f'{other_table_name}_{field}' for field in other_fields])
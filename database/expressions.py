@@ -0,0 +1,392 @@
+import operator
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Set
+
+try:
+    import numpy as np
+except ImportError:  # NumPy не обязателен: без него выражения вычисляются только на Python
+    np = None
+
+
+class Expression:
+    """
+    Базовый класс декларативного условия фильтрации.
+
+    Условие можно выполнить двумя способами:
+    - скомпилировать в единую функцию-предикат на чистом Python (`compile`);
+    - вычислить над массивами NumPy со столбцами таблицы как булеву маску (`mask`).
+
+    Условия объединяются операторами `&` (и), `|` (или) и `~` (не).
+    """
+
+    def __and__(self, other: 'Expression') -> 'Expression':
+        return And(self, other)
+
+    def __or__(self, other: 'Expression') -> 'Expression':
+        return Or(self, other)
+
+    def __invert__(self) -> 'Expression':
+        return Not(self)
+
+    def fields(self) -> Set[str]:
+        """
+        Возвращает множество полей, используемых в условии.
+        """
+        raise NotImplementedError()
+
+    def compile(self) -> Callable[[Any], bool]:
+        """
+        Компилирует условие в одну функцию-предикат от строки таблицы.
+        Каждое поле читается из строки один раз, все проверки выполняются одним выражением.
+
+        :return: Функция, возвращающая True для подходящих строк.
+        """
+        fields = sorted(self.fields())
+        names = {field: f'f{n}' for n, field in enumerate(fields)}
+        consts: List[Any] = []
+        body = self._source(names, consts)
+        lines = ['def predicate(row):']
+        for field in fields:
+            lines.append(f'    {names[field]} = getattr(row, {field!r}, None)')
+        lines.append(f'    return {body}')
+        namespace: Dict[str, Any] = {f'c{n}': value for n, value in enumerate(consts)}
+        exec('\n'.join(lines), namespace)
+        return namespace['predicate']
+
+    def mask(self, columns: Mapping[str, Any], size: int) -> Any:
+        """
+        Вычисляет условие над столбцами таблицы.
+
+        :param columns: Словарь "поле -> массив NumPy значений столбца".
+        :param size: Количество строк в таблице.
+        :return: Булев массив NumPy длиной `size`.
+        :raises Exception: Если NumPy не установлен.
+        """
+        if np is None:
+            raise Exception('Для векторного вычисления условий требуется NumPy')
+        return _as_mask(self._mask(columns, size), size)
+
+    def _source(self, names: Dict[str, str], consts: List[Any]) -> str:
+        raise NotImplementedError()
+
+    def _mask(self, columns: Mapping[str, Any], size: int) -> Any:
+        raise NotImplementedError()
+
+
+def _const(consts: List[Any], value: Any) -> str:
+    """
+    Регистрирует константу для сгенерированного кода и возвращает ее имя.
+    """
+    consts.append(value)
+    return f'c{len(consts) - 1}'
+
+
+def _as_mask(result: Any, size: int) -> Any:
+    """
+    Приводит результат сравнения NumPy к булевому массиву нужной длины.
+    Сравнение несовместимых типов может вернуть скаляр вместо массива.
+    """
+    result = np.asarray(result, dtype=bool)
+    if result.shape != (size,):
+        result = np.broadcast_to(result, (size,)).copy()
+    return result
+
+
+def _each(column: Any, func: Callable[[Any], bool], size: int) -> Any:
+    """
+    Поэлементно вычисляет условие над столбцом, для которого нет векторной операции.
+    Функция получает значения Python (`tolist`), а не скаляры NumPy, как и предикат на чистом Python.
+    """
+    return np.fromiter((bool(func(value)) for value in column.tolist()), dtype=bool, count=size)
+
+
+class Compare(Expression):
+    """
+    Сравнение значения поля с константой.
+    """
+    _operators = {
+        '==': operator.eq,
+        '!=': operator.ne,
+        '<': operator.lt,
+        '<=': operator.le,
+        '>': operator.gt,
+        '>=': operator.ge,
+    }
+
+    def __init__(self, field: str, op: str, value: Any):
+        """
+        :param field: Имя поля.
+        :param op: Оператор сравнения.
+        :param value: Значение для сравнения.
+        """
+        if op not in self._operators:
+            raise Exception(f'Неизвестный оператор сравнения: {op}')
+        self.field = field
+        self.op = op
+        self.value = value
+
+    def fields(self) -> Set[str]:
+        return {self.field}
+
+    def _source(self, names: Dict[str, str], consts: List[Any]) -> str:
+        name = names[self.field]
+        const = _const(consts, self.value)
+        if self.op in ('==', '!='):
+            return f'({name} {self.op} {const})'
+        # Пустые значения не участвуют в сравнениях на больше/меньше
+        return f'({name} is not None and {name} {self.op} {const})'
+
+    def _mask(self, columns: Mapping[str, Any], size: int) -> Any:
+        column = columns[self.field]
+        func = self._operators[self.op]
+        # Последовательность NumPy сравнил бы со столбцом поэлементно, а не как одно значение
+        if not isinstance(self.value, (list, tuple)):
+            if self.op in ('==', '!=') or column.dtype != object:
+                return func(column, self.value)
+        if self.op in ('==', '!='):
+            return _each(column, lambda value: func(value, self.value), size)
+        return _each(column, lambda value: value is not None and func(value, self.value), size)
+
+    def __repr__(self):
+        return f'F({self.field!r}) {self.op} {self.value!r}'
+
+
+class In(Expression):
+    """
+    Проверка вхождения значения поля в набор значений.
+    """
+
+    def __init__(self, field: str, values: Iterable[Any]):
+        """
+        :param field: Имя поля.
+        :param values: Допустимые значения.
+        """
+        self.field = field
+        self.values = tuple(values)
+
+    def fields(self) -> Set[str]:
+        return {self.field}
+
+    def _source(self, names: Dict[str, str], consts: List[Any]) -> str:
+        try:
+            values = frozenset(self.values)
+        except TypeError:
+            values = self.values
+        return f'({names[self.field]} in {_const(consts, values)})'
+
+    def _mask(self, columns: Mapping[str, Any], size: int) -> Any:
+        column = columns[self.field]
+        if any(isinstance(value, (list, tuple)) for value in self.values):
+            return _each(column, lambda value: value in self.values, size)
+        # np.isin приводит набор значений к общему типу, поэтому подходит только для значений одного типа
+        if column.dtype != object and len({type(value) for value in self.values}) == 1:
+            return np.isin(column, list(self.values))
+        result = np.zeros(size, dtype=bool)
+        for value in self.values:
+            result |= _as_mask(column == value, size)
+        return result
+
+    def __repr__(self):
+        return f'F({self.field!r}).in_({list(self.values)!r})'
+
+
+class Contains(Expression):
+    """
+    Проверка, что значение поля содержит подстроку (или элемент).
+    """
+
+    def __init__(self, field: str, value: Any):
+        """
+        :param field: Имя поля.
+        :param value: Искомая подстрока.
+        """
+        self.field = field
+        self.value = value
+
+    def fields(self) -> Set[str]:
+        return {self.field}
+
+    def _source(self, names: Dict[str, str], consts: List[Any]) -> str:
+        name = names[self.field]
+        return f'({name} is not None and {_const(consts, self.value)} in {name})'
+
+    def _mask(self, columns: Mapping[str, Any], size: int) -> Any:
+        column = columns[self.field]
+        if column.dtype.kind == 'U' and isinstance(self.value, str):
+            return np.char.find(column, self.value) >= 0
+        return _each(column, lambda value: value is not None and self.value in value, size)
+
+    def __repr__(self):
+        return f'F({self.field!r}).contains({self.value!r})'
+
+
+class Apply(Expression):
+    """
+    Произвольная функция от значения поля.
+    Не векторизуется, но участвует в общем скомпилированном предикате.
+    """
+
+    def __init__(self, field: str, func: Callable[[Any], bool]):
+        """
+        :param field: Имя поля.
+        :param func: Функция, принимающая значение поля.
+        """
+        self.field = field
+        self.func = func
+
+    def fields(self) -> Set[str]:
+        return {self.field}
+
+    def _source(self, names: Dict[str, str], consts: List[Any]) -> str:
+        return f'bool({_const(consts, self.func)}({names[self.field]}))'
+
+    def _mask(self, columns: Mapping[str, Any], size: int) -> Any:
+        return _each(columns[self.field], self.func, size)
+
+    def __repr__(self):
+        return f'F({self.field!r}).apply({self.func!r})'
+
+
+class And(Expression):
+    """
+    Логическое "и" нескольких условий.
+    """
+
+    def __init__(self, *expressions: Expression):
+        self.expressions = []
+        for expression in expressions:
+            # Вложенные "и" разворачиваются в один плоский список
+            if isinstance(expression, And):
+                self.expressions.extend(expression.expressions)
+            else:
+                self.expressions.append(expression)
+
+    def fields(self) -> Set[str]:
+        return set().union(*(expression.fields() for expression in self.expressions))
+
+    def _source(self, names: Dict[str, str], consts: List[Any]) -> str:
+        if not self.expressions:
+            return 'True'
+        return '(' + ' and '.join(e._source(names, consts) for e in self.expressions) + ')'
+
+    def _mask(self, columns: Mapping[str, Any], size: int) -> Any:
+        result = np.ones(size, dtype=bool)
+        for expression in self.expressions:
+            result &= _as_mask(expression._mask(columns, size), size)
+        return result
+
+    def __repr__(self):
+        return '(' + ' & '.join(map(repr, self.expressions)) + ')'
+
+
+class Or(Expression):
+    """
+    Логическое "или" нескольких условий.
+    """
+
+    def __init__(self, *expressions: Expression):
+        self.expressions = []
+        for expression in expressions:
+            if isinstance(expression, Or):
+                self.expressions.extend(expression.expressions)
+            else:
+                self.expressions.append(expression)
+
+    def fields(self) -> Set[str]:
+        return set().union(*(expression.fields() for expression in self.expressions))
+
+    def _source(self, names: Dict[str, str], consts: List[Any]) -> str:
+        if not self.expressions:
+            return 'False'
+        return '(' + ' or '.join(e._source(names, consts) for e in self.expressions) + ')'
+
+    def _mask(self, columns: Mapping[str, Any], size: int) -> Any:
+        result = np.zeros(size, dtype=bool)
+        for expression in self.expressions:
+            result |= _as_mask(expression._mask(columns, size), size)
+        return result
+
+    def __repr__(self):
+        return '(' + ' | '.join(map(repr, self.expressions)) + ')'
+
+
+class Not(Expression):
+    """
+    Логическое отрицание условия.
+    """
+
+    def __init__(self, expression: Expression):
+        self.expression = expression
+
+    def fields(self) -> Set[str]:
+        return self.expression.fields()
+
+    def _source(self, names: Dict[str, str], consts: List[Any]) -> str:
+        return f'(not {self.expression._source(names, consts)})'
+
+    def _mask(self, columns: Mapping[str, Any], size: int) -> Any:
+        return ~_as_mask(self.expression._mask(columns, size), size)
+
+    def __repr__(self):
+        return f'~{self.expression!r}'
+
+
+class F:
+    """
+    Ссылка на поле таблицы для построения условий фильтрации.
+
+    Пример:
+        (F('year').between(1950, 1980)) & (F('status') == BookStatus.BORROWED)
+    """
+    __hash__ = None
+
+    def __init__(self, name: str):
+        """
+        :param name: Имя поля.
+        """
+        self.name = name
+
+    def __eq__(self, value: Any) -> Expression:
+        return Compare(self.name, '==', value)
+
+    def __ne__(self, value: Any) -> Expression:
+        return Compare(self.name, '!=', value)
+
+    def __lt__(self, value: Any) -> Expression:
+        return Compare(self.name, '<', value)
+
+    def __le__(self, value: Any) -> Expression:
+        return Compare(self.name, '<=', value)
+
+    def __gt__(self, value: Any) -> Expression:
+        return Compare(self.name, '>', value)
+
+    def __ge__(self, value: Any) -> Expression:
+        return Compare(self.name, '>=', value)
+
+    def in_(self, values: Iterable[Any]) -> Expression:
+        """
+        Значение поля входит в набор значений.
+        """
+        return In(self.name, values)
+
+    def contains(self, value: Any) -> Expression:
+        """
+        Значение поля содержит подстроку.
+        """
+        return Contains(self.name, value)
+
+    def between(self, low: Any, high: Any) -> Expression:
+        """
+        Значение поля находится в диапазоне [low, high] включительно.
+        """
+        return And(Compare(self.name, '>=', low), Compare(self.name, '<=', high))
+
+    def apply(self, func: Callable[[Any], bool]) -> Expression:
+        """
+        Произвольная функция от значения поля.
+        """
+        return Apply(self.name, func)
+
+    def __repr__(self):
+        return f'F({self.name!r})'
+
@@ -0,0 +1,186 @@
+from bisect import bisect_left
+from itertools import count
+from typing import Any, Dict, Hashable, List, Tuple
+from uuid import UUID
+
+from database.expressions import Expression
+from tables import TableRow
+
+
+class _SortedRows:
+    """
+    Отсортированный список записей. Место записи находится бинарным поиском за O(log n),
+    но вставка и удаление сдвигают элементы списка и занимают O(n).
+    Ключи хранятся отдельно от записей, чтобы поиск не обращался к полям записей.
+    """
+
+    def __init__(self):
+        self.keys: List[Tuple] = []
+        self.rows: List[TableRow] = []
+
+    def add(self, key: Tuple, row: TableRow):
+        index = bisect_left(self.keys, key)
+        self.keys.insert(index, key)
+        self.rows.insert(index, row)
+
+    def remove(self, key: Tuple):
+        index = bisect_left(self.keys, key)
+        del self.keys[index]
+        del self.rows[index]
+
+
+class View:
+    """
+    Материализованное представление над таблицей: соединение, фильтрация и сортировка.
+    Результат хранится готовым и обновляется инкрементально при каждом изменении данных
+    через `DataBase.add`, `DataBase.update` и `DataBase.delete`.
+
+    Записи групп хранятся в отсортированных списках: поиск места записи занимает O(log n),
+    но вставка и удаление записи сдвигают список группы и занимают O(n) от размера группы.
+    Для очень больших групп каждое изменение обходится дороже, чем можно ожидать.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            table: type[TableRow],
+            join: type[TableRow] | None = None,
+            join_field_self: str | None = None,
+            where: Expression | None = None,
+            order_by: str | None = None,
+            group_by: str | None = None,
+    ):
+        """
+        Описание представления.
+
+        :param name: Имя представления.
+        :param table: Основная таблица.
+        :param join: Присоединяемая таблица (соединение по `id`, поля добавляются с префиксом имени таблицы).
+        :param join_field_self: Поле основной таблицы для соединения (по умолчанию `<таблица>_id`).
+        :param where: Условие отбора записей.
+        :param order_by: Поле для сортировки записей.
+        :param group_by: Поле, по значению которого записи разбиваются на группы.
+        """
+        self.name = name
+        self.table_name = table.__name__.lower()
+        self.join_table_name = join.__name__.lower() if join else None
+        self.join_field_self = join_field_self or f'{self.join_table_name}_id'
+        self.join_fields = list(join.__annotations__.keys()) if join else []
+        self.predicate = where.compile() if where else None
+        self.order_by = order_by
+        self.group_by = group_by
+        self._clear()
+
+    def _clear(self):
+        """
+        Очищает сохраненный результат и индексы представления.
+        """
+        self._groups: Dict[Hashable, _SortedRows] = {}  # Группы отобранных записей
+        self._members: Dict[UUID, Tuple[Hashable, Tuple]] = {}  # id записи -> (группа, ключ сортировки)
+        self._joined: Dict[UUID, TableRow] = {}  # Записи присоединяемой таблицы по id
+        self._by_join_key: Dict[Any, Dict[UUID, TableRow]] = {}  # Записи основной таблицы по полю соединения
+        self._join_keys: Dict[UUID, Any] = {}  # id записи -> значение поля соединения
+        self._positions: Dict[UUID, int] = {}  # id записи -> порядковый номер в таблице
+        self._counter = count()
+
+    def rebuild(self, db: Dict[str, List[TableRow]]):
+        """
+        Полностью пересчитывает представление по данным базы.
+
+        :param db: Словарь таблиц базы данных.
+        """
+        self._clear()
+        if self.join_table_name:
+            for row in db.get(self.join_table_name, []):
+                self._joined[row.id] = row
+        for row in db.get(self.table_name, []):
+            self._refresh(row)
+
+    def rows(self, group: Hashable = None) -> List[TableRow]:
+        """
+        Возвращает записи представления (или одной группы) за время, пропорциональное размеру результата.
+
+        :param group: Значение поля группировки.
+        :return: Список записей.
+        """
+        rows = self._groups.get(group)
+        return list(rows.rows) if rows else []
+
+    def joined_fields(self) -> List[str]:
+        """
+        Возвращает имена полей, которые представление добавляет записям основной таблицы.
+        """
+        return [f'{self.join_table_name}_{field}' for field in self.join_fields]
+
+    def apply(self, table_name: str, action: str, rows: List[TableRow]):
+        """
+        Применяет изменение таблицы к представлению.
+
+        :param table_name: Имя измененной таблицы.
+        :param action: Тип изменения: 'add', 'update' или 'delete'.
+        :param rows: Измененные записи.
+        """
+        if table_name == self.table_name:
+            for row in rows:
+                if action == 'delete':
+                    self._forget(row)
+                else:
+                    self._refresh(row)
+        elif table_name == self.join_table_name:
+            for row in rows:
+                if action == 'delete':
+                    self._joined.pop(row.id, None)
+                else:
+                    self._joined[row.id] = row
+                for base_row in list(self._by_join_key.get(row.id, {}).values()):
+                    self._refresh(base_row)
+
+    def _refresh(self, row: TableRow):
+        """
+        Пересчитывает присоединенные поля записи основной таблицы и ее место в представлении.
+        """
+        self._discard(row)
+        if row.id not in self._positions:
+            self._positions[row.id] = next(self._counter)
+
+        if self.join_table_name:
+            join_key = getattr(row, self.join_field_self, None)
+            old_key = self._join_keys.get(row.id)
+            if old_key != join_key:
+                self._by_join_key.get(old_key, {}).pop(row.id, None)
+            self._join_keys[row.id] = join_key
+            self._by_join_key.setdefault(join_key, {})[row.id] = row
+            joined_row = self._joined.get(join_key)
+            for field, joined_field in zip(self.join_fields, self.joined_fields()):
+                value = getattr(joined_row, field) if joined_row else None
+                setattr(row, joined_field, value)
+
+        if self.predicate and not self.predicate(row):
+            return
+        group = getattr(row, self.group_by, None) if self.group_by else None
+        key = (self._positions[row.id],)
+        if self.order_by:
+            value = getattr(row, self.order_by, None)
+            key = (value is None, value) + key
+        self._groups.setdefault(group, _SortedRows()).add(key, row)
+        self._members[row.id] = (group, key)
+
+    def _discard(self, row: TableRow):
+        """
+        Убирает запись из результата представления, если она там есть.
+        """
+        member = self._members.pop(row.id, None)
+        if member:
+            group, key = member
+            self._groups[group].remove(key)
+            if not self._groups[group].rows:
+                del self._groups[group]
+
+    def _forget(self, row: TableRow):
+        """
+        Полностью удаляет запись основной таблицы из представления и индексов.
+        """
+        self._discard(row)
+        self._positions.pop(row.id, None)
+        join_key = self._join_keys.pop(row.id, None)
+        self._by_join_key.get(join_key, {}).pop(row.id, None)
@@ -1,4 +1,6 @@
 from database.database import DataBase
+from database.expressions import F
+from database.views import View
 from menu.base import Menu, Question, ListOfQuestions, ChooseMenu, QuestionInt
 from tables import Book, Author, BookStatus
 
@@ -126,14 +128,18 @@ class FilterBooks(ListBooks):
         Фильтрация книг по выбранному критерию.
         """
         value = self.menu_items[0].answer
-        table = DataBase(Book)
-        table.join(Author)
         if self.parent.choice == 1:
-            results = table.filter(name=lambda field_value: value in field_value)
+            table = DataBase(Book)
+            table.join(Author)
+            results = table.filter(F('name').contains(value))
         elif self.parent.choice == 2:
-            results = table.filter(author_name=lambda field_value: value in field_value)
+            results = []
+            for author in DataBase(Author).filter(F('name').contains(value)):
+                results.extend(DataBase.view('books_by_author', author.id))
         elif self.parent.choice == 3:
-            results = table.filter(year=int(value))
+            table = DataBase(Book)
+            table.join(Author)
+            results = table.filter(F('year') == int(value))
 
         self.print_table(results)
         self.repeat()
@@ -149,12 +155,10 @@ class FilterBooksByStatus(ListBooks):
         """
         Фильтрация книг по статусу.
         """
-        table = DataBase(Book)
-        table.join(Author)
         if self.parent.choice == 1:
-            results = table.filter(status=BookStatus.AVAILABLE)
+            results = DataBase.view('available_books')
         elif self.parent.choice == 2:
-            results = table.filter(status=BookStatus.BORROWED)
+            results = DataBase.view('borrowed_books')
         self.print_table(results)
         self.repeat(self.parent.parent)
 
@@ -203,6 +207,15 @@ class ChangeBookStatus(Menu):
             print('Статус успешно изменен')
             parent.handle(parent.parent)
 
+def register_views():
+    """
+    Регистрирует материализованные представления, которые обновляются при каждом изменении данных.
+    """
+    DataBase.register_view(View('available_books', Book, join=Author, where=F('status') == BookStatus.AVAILABLE))
+    DataBase.register_view(View('borrowed_books', Book, join=Author, where=F('status') == BookStatus.BORROWED))
+    DataBase.register_view(View('books_by_author', Book, join=Author, order_by='year', group_by='author_id'))
+
+
 # Главное меню
 main_menu = ChooseMenu(
     'Основное меню',
@@ -234,5 +247,6 @@ if __name__ == "__main__":
     """
     Инициализация базы данных и запуск основного меню.
     """
+    register_views()
     DataBase.init_db('database.json')
     main_menu.handle()
@@ -1,6 +1,7 @@
 import uuid
 from enum import Enum
-from uuid import UUID
+from typing import Any, Callable, Dict, List, Tuple
+from uuid import UUID, SafeUUID
 
 
 class BookStatus(Enum):
@@ -18,12 +19,138 @@ class BookStatus(Enum):
         return self.value
 
 
+_new_object = object.__new__
+_set_attribute = object.__setattr__
+
+
+def _parse_uuid(value: str) -> UUID:
+    """
+    Быстро создает UUID из строки вида `str(uuid)`.
+    В отличие от `UUID(value)` не разбирает другие форматы записи и не вызывает `__init__`,
+    а заполняет поля так же, как `UUID.__setstate__`.
+
+    :param value: Строковое представление UUID.
+    :return: UUID.
+    :raises ValueError: Если строка не является UUID.
+    """
+    hex_value = value.replace('-', '')
+    if len(hex_value) != 32:
+        raise ValueError('badly formed hexadecimal UUID string')
+    result = _new_object(UUID)
+    _set_attribute(result, 'int', int(hex_value, 16))
+    _set_attribute(result, 'is_safe', SafeUUID.unknown)
+    return result
+
+
+def _build_codecs(cls: type) -> Tuple[Callable[[List], Any], Callable[[Any], Tuple], List[Dict]]:
+    """
+    Генерирует по аннотациям класса таблицы функции преобразования записи.
+    Декодер создает запись из списка значений в порядке `field_names` без вызова `__init__`,
+    сразу преобразуя строки в UUID и имена элементов Enum в элементы Enum.
+    Энкодер возвращает кортеж значений, готовых для JSON.
+    Преобразования полей-ссылок (UUID, кроме `id`) кэшируются, так как их значения повторяются.
+    Кэши нужны только на время одной загрузки или сохранения таблицы и очищаются через
+    `TableRow.clear_codec_caches`.
+
+    :param cls: Класс таблицы.
+    :return: Декодер, энкодер и список кэшей.
+    """
+    names = cls.field_names
+    namespace: Dict[str, Any] = {
+        '_new': _new_object, '_cls': cls, 'UUID': UUID, 'uuid4': uuid.uuid4, '_uuid': _parse_uuid,
+    }
+    variables = [f'f{n}' for n in range(len(names))]
+    decoded = []
+    loads = []
+    encoded = []
+    caches = []
+    for n, name in enumerate(names):
+        var = variables[n]
+        annotation = UUID if name == 'id' else cls.__annotations__[name]
+        is_enum = isinstance(annotation, type) and issubclass(annotation, Enum)
+        default = f'd{n}'
+        namespace[default] = getattr(cls, name, None)
+        if name == 'id':
+            decoded.append(f'{name!r}: _uuid({var}) if {var} else uuid4()')
+        elif annotation is UUID:
+            # Ссылки на другие таблицы повторяются, поэтому их UUID кэшируются
+            namespace[f'k{n}'] = {}
+            caches.append(namespace[f'k{n}'])
+            decoded.append(f'{name!r}: (k{n}.get({var}) or k{n}.setdefault({var}, _uuid({var}))) if {var} else {default}')
+        elif is_enum:
+            namespace[f't{n}'] = annotation
+            # Прямой доступ к словарю элементов быстрее, чем `Enum[name]`
+            namespace[f'm{n}'] = dict(annotation.__members__)
+            decoded.append(f'{name!r}: m{n}[{var}] if {var} else {default}')
+        else:
+            decoded.append(f'{name!r}: {var}')
+
+        if hasattr(cls, name):
+            loads.append(f'    {var} = row.{name}')
+        else:
+            loads.append(f'    {var} = getattr(row, {name!r}, None)')
+        if name == 'id':
+            encoded.append(f'str({var}) if {var}.__class__ is UUID else {var}')
+        elif annotation is UUID:
+            namespace[f'e{n}'] = {}
+            caches.append(namespace[f'e{n}'])
+            encoded.append(
+                f'(e{n}.get({var}) or e{n}.setdefault({var}, str({var}))) if {var}.__class__ is UUID else {var}'
+            )
+        elif is_enum:
+            encoded.append(f'{var}.name if {var}.__class__ is t{n} else {var}')
+        else:
+            encoded.append(var)
+
+    source = '\n'.join([
+        'def decode(values):',
+        f'    {", ".join(variables)}, = values',
+        '    row = _new(_cls)',
+        f'    row.__dict__ = {{{", ".join(decoded)}}}',
+        '    return row',
+        '',
+        'def encode(row):',
+        *loads,
+        f'    return ({", ".join(encoded)},)',
+    ])
+    exec(source, namespace)
+    return namespace['decode'], namespace['encode'], caches
+
+
 class TableRow:
     """
     Базовый класс для строки таблицы.
     Содержит обязательное поле `id`, которое автоматически генерируется при создании объекта.
+
+    Для каждого класса таблицы по аннотациям генерируются:
+    - `field_names` — порядок полей при сохранении;
+    - `from_values(values)` — создание записи из списка значений в этом порядке;
+    - `to_values(row)` — кортеж значений записи, готовых для JSON.
     """
     id: UUID  # Поле id для уникального идентификатора записи
+    field_names: Tuple[str, ...] = ('id',)
+    from_values: Callable[[List], 'TableRow']
+    to_values: Callable[['TableRow'], Tuple]
+    _codec_caches: List[Dict] = []
+
+    def __init_subclass__(cls, **kwargs):
+        """
+        Генерирует функции преобразования записи при объявлении класса таблицы.
+        """
+        super().__init_subclass__(**kwargs)
+        cls.field_names = tuple(['id'] + list(cls.__annotations__.keys()))
+        decode, encode, caches = _build_codecs(cls)
+        cls.from_values = staticmethod(decode)
+        cls.to_values = staticmethod(encode)
+        cls._codec_caches = caches
+
+    @classmethod
+    def clear_codec_caches(cls):
+        """
+        Очищает кэши преобразования полей-ссылок, чтобы они не хранили значения между загрузками и сохранениями.
+        """
+        for cache in cls._codec_caches:
+            cache.clear()
 
     def __init__(self, **kwargs):
         """
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Модули проекта импортируются от корня репозитория (`from database.database import DataBase`)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,125 @@
+import uuid
+
+import pytest
+
+from database.database import DataBase
+from database.expressions import F
+from tables import Book, BookStatus
+
+np = pytest.importorskip('numpy')
+
+AUTHOR_ID = uuid.uuid4()
+
+
+def make_db(tmp_path, years, names=None):
+    """
+    Создает базу с книгами, у которых заданы годы (и названия).
+    """
+    DataBase.init_db(str(tmp_path / 'database.json'))
+    names = names or [f'book {n}' for n in range(len(years))]
+    books = []
+    for n, (year, name) in enumerate(zip(years, names)):
+        status = BookStatus.BORROWED if n % 3 == 0 else BookStatus.AVAILABLE
+        books.append(Book(name=name, author_id=AUTHOR_ID, year=year, status=status))
+    DataBase(Book).add(books)
+    return DataBase(Book)
+
+
+def filter_both(db, expression, monkeypatch):
+    """
+    Выполняет фильтрацию скомпилированным предикатом и через NumPy, возвращает оба результата.
+    """
+    monkeypatch.setattr(DataBase, '_vectorize_threshold', 10 ** 9)
+    python_rows = [row.id for row in db.filter(expression)]
+    monkeypatch.setattr(DataBase, '_vectorize_threshold', 0)
+    numpy_rows = [row.id for row in db.filter(expression)]
+    return python_rows, numpy_rows
+
+
+NUMERIC_EXPRESSIONS = [
+    F('year') == 1960,
+    F('year') != 1960,
+    F('year') < 1960,
+    F('year') <= 1960,
+    F('year') > 1960,
+    F('year') >= 1960,
+    F('year').in_([1950, 1960, 2000]),
+    F('year').between(1950, 1980),
+    (F('year') > 1950) & (F('status') == BookStatus.BORROWED),
+    (F('year') < 1950) | (F('status') == BookStatus.BORROWED),
+    ~(F('year') >= 1960),
+    F('status').in_([BookStatus.BORROWED]),
+    F('name').contains('1'),
+    F('name').contains('1') | ~F('year').in_([1960]),
+    F('year').apply(lambda value: isinstance(value, int) and value > 1960),
+    F('name').apply(lambda value: type(value) is str and value.endswith('1')),
+]
+
+
+@pytest.mark.parametrize('expression', NUMERIC_EXPRESSIONS, ids=repr)
+def test_numeric_column(tmp_path, monkeypatch, expression):
+    db = make_db(tmp_path, [1940 + n % 70 for n in range(300)])
+    python_rows, numpy_rows = filter_both(db, expression, monkeypatch)
+    assert python_rows == numpy_rows
+    assert python_rows
+
+
+@pytest.mark.parametrize('expression', NUMERIC_EXPRESSIONS, ids=repr)
+def test_column_with_none(tmp_path, monkeypatch, expression):
+    years = [None if n % 4 == 0 else 1940 + n % 70 for n in range(300)]
+    names = [None if n % 5 == 0 else f'book {n}' for n in range(300)]
+    db = make_db(tmp_path, years, names)
+    python_rows, numpy_rows = filter_both(db, expression, monkeypatch)
+    assert python_rows == numpy_rows
+
+
+@pytest.mark.parametrize('expression', [
+    F('year') == 1990,
+    F('year') == '1990',
+    F('year') != 1990,
+    F('year').in_([1990]),
+    F('year').in_(['1990']),
+    F('year').in_([1990, '1990']),
+    ~(F('year') == 1990),
+    (F('year') == 1990) | (F('year') == '1990'),
+    F('year').apply(lambda value: isinstance(value, int)),
+], ids=repr)
+def test_mixed_type_column(tmp_path, monkeypatch, expression):
+    db = make_db(tmp_path, [1990 if n % 2 else '1990' for n in range(300)])
+    python_rows, numpy_rows = filter_both(db, expression, monkeypatch)
+    assert python_rows == numpy_rows
+    assert python_rows
+
+
+def test_mixed_type_values_for_in(tmp_path, monkeypatch):
+    db = make_db(tmp_path, [1940 + n % 70 for n in range(300)])
+    python_rows, numpy_rows = filter_both(db, F('year').in_([1960, '1970']), monkeypatch)
+    assert python_rows == numpy_rows
+    assert len(python_rows) == len(db.filter(year=1960))
+
+
+def test_keyword_conditions(tmp_path, monkeypatch):
+    db = make_db(tmp_path, [1940 + n % 70 for n in range(300)])
+    expression = F('year').between(1950, 1980) & (F('status') == BookStatus.BORROWED)
+    expected = [row.id for row in db.filter(expression)]
+    found = db.filter(year=lambda year: 1950 <= year <= 1980, status=BookStatus.BORROWED)
+    assert [row.id for row in found] == expected
+
+
+def test_update_refreshes_columns(tmp_path, monkeypatch):
+    db = make_db(tmp_path, [1940 + n % 70 for n in range(300)])
+    monkeypatch.setattr(DataBase, '_vectorize_threshold', 0)
+    book = db.filter(F('year') == 1960)[0]
+    db.update(book.id, year=3000)
+    assert [row.id for row in db.filter(F('year') > 2500)] == [book.id]
+
+
+@pytest.mark.parametrize('expression', [
+    F('year') == [1960, 1961],
+    F('year') != (1960, 1961),
+    F('year').in_([[1960, 1961], 1970]),
+], ids=repr)
+def test_sequence_values(tmp_path, monkeypatch, expression):
+    db = make_db(tmp_path, [1960, 1961])
+    python_rows, numpy_rows = filter_both(db, expression, monkeypatch)
+    assert python_rows == numpy_rows
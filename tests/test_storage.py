@@ -0,0 +1,114 @@
+import json
+
+import pytest
+
+import main
+from database.database import DataBase
+from tables import Author, Book, BookStatus
+
+
+def fill_db(path):
+    """
+    Создает базу с одним автором и двумя книгами.
+    """
+    DataBase.init_db(str(path))
+    author = Author(name='Толстой Л.Н.')
+    DataBase(Author).add(author)
+    books = [
+        Book(name='Война и мир', author_id=author.id, year=1869, status=BookStatus.AVAILABLE),
+        Book(name='Анна Каренина', author_id=author.id, year=1878, status=BookStatus.BORROWED),
+    ]
+    DataBase(Book).add(books)
+    DataBase.save_db()
+    return author, books
+
+
+def test_new_database_creates_manifest_and_table_files(tmp_path):
+    DataBase.init_db(str(tmp_path / 'database.json'))
+    manifest = json.loads((tmp_path / 'database.json').read_text())
+    assert manifest == {'tables': {'book': 'database.book.json', 'author': 'database.author.json'}}
+    assert json.loads((tmp_path / 'database.book.json').read_text()) == [list(Book.field_names)]
+
+
+def test_old_format_is_migrated(tmp_path):
+    author = Author(name='Пушкин А.С.')
+    book = Book(name='Капитанская дочка', author_id=author.id, year=1836, status=BookStatus.BORROWED)
+    old_data = {
+        'book': [
+            ['id', 'name', 'author_id', 'year', 'status'],
+            [str(book.id), book.name, str(author.id), book.year, 'BORROWED'],
+        ],
+        'author': [['id', 'name'], [str(author.id), author.name]],
+    }
+    (tmp_path / 'database.json').write_text(json.dumps(old_data))
+
+    DataBase.init_db(str(tmp_path / 'database.json'))
+
+    manifest = json.loads((tmp_path / 'database.json').read_text())
+    assert manifest['tables'] == {'book': 'database.book.json', 'author': 'database.author.json'}
+    assert json.loads((tmp_path / 'database.book.json').read_text()) == old_data['book']
+    assert json.loads((tmp_path / 'database.author.json').read_text()) == old_data['author']
+
+    DataBase.init_db(str(tmp_path / 'database.json'))
+    books = DataBase(Book).filter()
+    assert [(row.id, row.name, row.author_id, row.status) for row in books] == [
+        (book.id, book.name, author.id, BookStatus.BORROWED)
+    ]
+
+
+def test_tables_are_loaded_lazily(tmp_path):
+    fill_db(tmp_path / 'database.json')
+    DataBase.init_db(str(tmp_path / 'database.json'))
+    assert DataBase._db == {}
+    DataBase(Book)
+    assert list(DataBase._db) == ['book']
+
+
+def test_views_are_filled_on_first_access(tmp_path, monkeypatch):
+    monkeypatch.setattr(DataBase, '_views', {})
+    main.register_views()
+    _, books = fill_db(tmp_path / 'database.json')
+
+    DataBase.init_db(str(tmp_path / 'database.json'))
+    assert DataBase._db == {}
+
+    assert [row.id for row in DataBase.view('borrowed_books')] == [books[1].id]
+    assert sorted(DataBase._db) == ['author', 'book']
+
+
+def test_save_rewrites_only_dirty_tables(tmp_path, monkeypatch):
+    _, books = fill_db(tmp_path / 'database.json')
+    DataBase.init_db(str(tmp_path / 'database.json'))
+    author_file = (tmp_path / 'database.author.json').read_text()
+    written = []
+    write_file = DataBase._write_file
+    monkeypatch.setattr(DataBase, '_write_file', lambda path, text: (written.append(path), write_file(path, text)))
+
+    DataBase(Book).update(books[0].id, status=BookStatus.BORROWED)
+    DataBase.save_db()
+
+    assert written == [str(tmp_path / 'database.book.json')]
+    assert (tmp_path / 'database.author.json').read_text() == author_file
+
+
+def test_round_trip(tmp_path):
+    author, books = fill_db(tmp_path / 'database.json')
+    DataBase.init_db(str(tmp_path / 'database.json'))
+    DataBase(Book).update(books[0].id, status=BookStatus.BORROWED, year=1870)
+    DataBase(Book).delete(books[1].id)
+    DataBase.save_db()
+
+    DataBase.init_db(str(tmp_path / 'database.json'))
+    loaded = DataBase(Book).filter()
+    assert [(row.id, row.name, row.author_id, row.year, row.status) for row in loaded] == [
+        (books[0].id, books[0].name, author.id, 1870, BookStatus.BORROWED)
+    ]
+    assert [(row.id, row.name) for row in DataBase(Author).filter()] == [(author.id, author.name)]
+
+
+def test_missing_table_file_raises(tmp_path):
+    fill_db(tmp_path / 'database.json')
+    (tmp_path / 'database.book.json').unlink()
+    DataBase.init_db(str(tmp_path / 'database.json'))
+    with pytest.raises(Exception, match='book'):
+        DataBase(Book)
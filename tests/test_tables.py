@@ -0,0 +1,55 @@
+import gc
+import uuid
+
+import pytest
+
+from database.database import DataBase
+from tables import Author, Book, BookStatus
+
+
+def test_codecs_round_trip():
+    book = Book(name='Война и мир', author_id=uuid.uuid4(), year=1869, status=BookStatus.BORROWED)
+    values = Book.to_values(book)
+    assert values == (str(book.id), book.name, str(book.author_id), 1869, 'BORROWED')
+    decoded = Book.from_values(list(values))
+    assert vars(decoded) == vars(book)
+
+
+def test_codecs_match_constructor():
+    values = [str(uuid.uuid4()), 'Анна Каренина', str(uuid.uuid4()), 1878, 'AVAILABLE']
+    expected = Book(**dict(zip(Book.field_names, values)))
+    assert vars(Book.from_values(values)) == vars(expected)
+
+
+def test_codec_caches_are_cleared(tmp_path):
+    DataBase.init_db(str(tmp_path / 'database.json'))
+    author = Author(name='Толстой Л.Н.')
+    DataBase(Author).add(author)
+    DataBase(Book).add([Book(name=str(n), author_id=author.id, year=n, status=BookStatus.AVAILABLE) for n in range(5)])
+    DataBase.save_db()
+    assert not any(Book._codec_caches)
+
+    DataBase.init_db(str(tmp_path / 'database.json'))
+    assert len(DataBase(Book).filter()) == 5
+    assert not any(Book._codec_caches)
+
+
+def test_malformed_id_is_rejected():
+    with pytest.raises(ValueError):
+        Book.from_values(['12345', 'Книга', str(uuid.uuid4()), 1900, 'AVAILABLE'])
+
+
+def test_parsed_uuid_matches_uuid():
+    value = uuid.uuid4()
+    parsed = Book.from_values([str(value), 'Книга', str(value), 1900, 'AVAILABLE'])
+    assert parsed.id == value and hash(parsed.id) == hash(value) and str(parsed.id) == str(value)
+    assert parsed.author_id == value
+
+
+def test_gc_is_restored_after_load_and_save(tmp_path):
+    DataBase.init_db(str(tmp_path / 'database.json'))
+    DataBase(Author).add(Author(name='Толстой Л.Н.'))
+    DataBase.save_db()
+    DataBase.init_db(str(tmp_path / 'database.json'))
+    DataBase(Author)
+    assert gc.isenabled()
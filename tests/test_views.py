@@ -0,0 +1,112 @@
+import random
+
+import pytest
+
+import main
+from database.database import DataBase
+from database.expressions import F
+from tables import Author, Book, BookStatus
+
+
+@pytest.fixture(autouse=True)
+def views(monkeypatch):
+    """
+    Регистрирует представления приложения в отдельном реестре на время теста.
+    """
+    monkeypatch.setattr(DataBase, '_views', {})
+    main.register_views()
+
+
+def snapshot(rows):
+    """
+    Запоминает записи представления вместе с присоединенным именем автора.
+    """
+    return [(row.id, row.author_name) for row in rows]
+
+
+def expected_views(authors):
+    """
+    Пересчитывает представления из `main.py` через `join` и `filter`.
+    """
+    table = DataBase(Book)
+    table.join(Author)
+    expected = {
+        'available_books': snapshot(table.filter(F('status') == BookStatus.AVAILABLE)),
+        'borrowed_books': snapshot(table.filter(F('status') == BookStatus.BORROWED)),
+    }
+    for author in authors:
+        books = DataBase(Book).filter(author_id=author.id)
+        expected[('books_by_author', author.id)] = snapshot(sorted(books, key=lambda row: row.year))
+    return expected
+
+
+def actual_views(authors):
+    """
+    Читает представления из `main.py`.
+    """
+    actual = {
+        'available_books': snapshot(DataBase.view('available_books')),
+        'borrowed_books': snapshot(DataBase.view('borrowed_books')),
+    }
+    for author in authors:
+        actual[('books_by_author', author.id)] = snapshot(DataBase.view('books_by_author', author.id))
+    return actual
+
+
+def test_views_follow_changes(tmp_path):
+    rnd = random.Random(27)
+    DataBase.init_db(str(tmp_path / 'database.json'))
+    authors = [Author(name=f'Автор {n}') for n in range(4)]
+    DataBase(Author).add(authors)
+    # Удаленные авторы остаются в списке, чтобы проверять, что их книги теряют имя автора
+    known_authors = list(authors)
+    books = []
+
+    for step in range(400):
+        action = rnd.random()
+        if action < 0.3 or not books:
+            book = Book(
+                name=f'Книга {step}',
+                author_id=rnd.choice(known_authors).id,
+                year=rnd.randint(1900, 1910),
+                status=rnd.choice(list(BookStatus)),
+            )
+            books.append(book)
+            DataBase(Book).add(book)
+        elif action < 0.45:
+            DataBase(Book).update(rnd.choice(books).id, status=rnd.choice(list(BookStatus)))
+        elif action < 0.55:
+            DataBase(Book).update(rnd.choice(books).id, year=rnd.randint(1900, 1910))
+        elif action < 0.65:
+            DataBase(Book).update(rnd.choice(books).id, author_id=rnd.choice(known_authors).id)
+        elif action < 0.75:
+            DataBase(Book).delete(books.pop(rnd.randrange(len(books))).id)
+        elif action < 0.82:
+            author = Author(name=f'Автор {step}')
+            authors.append(author)
+            known_authors.append(author)
+            DataBase(Author).add(author)
+        elif action < 0.92 and authors:
+            DataBase(Author).update(rnd.choice(authors).id, name=f'Автор {step}')
+        elif authors:
+            DataBase(Author).delete(authors.pop(rnd.randrange(len(authors))).id)
+
+        actual = actual_views(known_authors)
+        assert actual == expected_views(known_authors), f'шаг {step}'
+
+
+def test_views_are_rebuilt_after_reload(tmp_path):
+    DataBase.init_db(str(tmp_path / 'database.json'))
+    author = Author(name='Толстой Л.Н.')
+    DataBase(Author).add(author)
+    DataBase(Book).add([
+        Book(name='Анна Каренина', author_id=author.id, year=1878, status=BookStatus.BORROWED),
+        Book(name='Война и мир', author_id=author.id, year=1869, status=BookStatus.AVAILABLE),
+    ])
+    DataBase.save_db()
+
+    DataBase.init_db(str(tmp_path / 'database.json'))
+    assert [row.name for row in DataBase.view('books_by_author', author.id)] == ['Война и мир', 'Анна Каренина']
+    assert [(row.name, row.author_name) for row in DataBase.view('borrowed_books')] == [
+        ('Анна Каренина', 'Толстой Л.Н.')
+    ]